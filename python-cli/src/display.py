@@ -1,6 +1,5 @@
 """结果展示模块"""
 
-from datetime import datetime, timedelta
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
@@ -17,15 +16,27 @@ MONTH_NAMES = ["一月", "二月", "三月", "四月", "五月", "六月",
 
 WEEKDAY_NAMES = ["周一", "周二", "周三", "周四", "周五", "周六", "周日"]
 
+# 预先生成各长度的条形图字符串，渲染时按长度取用，下标即条形长度
+FULL_BLOCKS = tuple("█" * i for i in range(31))
+SHADE_BLOCKS = tuple("▓" * i for i in range(21))
+DOT_BLOCKS = tuple("▪" * i for i in range(16))
+
+
+def format_number(n: int) -> str:
+    """格式化数字，带千位分隔符"""
+    return f"{n:,}"
+
 
 def display_stats(stats: YearStats) -> None:
     """展示统计结果"""
-    console.print()
-    console.print(Panel.fit(
-        f"[bold cyan]我和我的代码，还有 {stats.year} 年[/bold cyan]",
-        border_style="cyan",
-    ))
-    console.print()
+    console.print(
+        "",
+        Panel.fit(
+            f"[bold cyan]我和我的代码，还有 {stats.year} 年[/bold cyan]",
+            border_style="cyan",
+        ),
+        "",
+    )
 
     # 基础统计
     display_basic_stats(stats)
@@ -67,10 +78,10 @@ def display_basic_stats(stats: YearStats) -> None:
     table.add_column("指标", style="cyan")
     table.add_column("数值", style="green", justify="right")
 
-    table.add_row("总提交数", f"{stats.total_commits:,}")
-    table.add_row("新增代码行", f"+{stats.total_added_lines:,}")
-    table.add_row("删除代码行", f"-{stats.total_deleted_lines:,}")
-    table.add_row("净增代码行", f"{stats.total_added_lines - stats.total_deleted_lines:,}")
+    table.add_row("总提交数", format_number(stats.total_commits))
+    table.add_row("新增代码行", f"+{format_number(stats.total_added_lines)}")
+    table.add_row("删除代码行", f"-{format_number(stats.total_deleted_lines)}")
+    table.add_row("净增代码行", format_number(stats.total_added_lines - stats.total_deleted_lines))
     table.add_row("活跃天数", f"{stats.active_days} / 365 天")
     table.add_row("周末提交天数", f"{stats.weekend_days} 天")
 
@@ -80,8 +91,7 @@ def display_basic_stats(stats: YearStats) -> None:
         table.add_row("日均提交", f"{avg_per_day:.1f}")
         table.add_row("活跃日均提交", f"{avg_per_active:.1f}")
 
-    console.print(table)
-    console.print()
+    console.print(table, "")
 
 
 def display_streak(stats: YearStats) -> None:
@@ -89,59 +99,57 @@ def display_streak(stats: YearStats) -> None:
     if stats.max_streak <= 0:
         return
 
-    console.print("[bold]🔥 连续提交记录[/bold]")
-    console.print(f"  最长连击: [bold green]{stats.max_streak}[/bold green] 天")
+    lines = [
+        "[bold]🔥 连续提交记录[/bold]",
+        f"  最长连击: [bold green]{stats.max_streak}[/bold green] 天",
+    ]
     if stats.current_streak > 0:
-        console.print(f"  当前连击: [bold yellow]{stats.current_streak}[/bold yellow] 天 (保持中!)")
-    console.print()
+        lines.append(f"  当前连击: [bold yellow]{stats.current_streak}[/bold yellow] 天 (保持中!)")
+    lines.append("")
+
+    console.print("\n".join(lines))
 
 
 def display_heatmap(stats: YearStats) -> None:
     """显示热力图（简化版）"""
-    if not stats.heatmap:
+    if not any(stats.heatmap):
         return
 
-    console.print("[bold]📅 提交热力图[/bold]")
+    lines = ["[bold]📅 提交热力图[/bold]"]
 
     # 按月份统计
-    month_commits = [0] * 12
-
-    for day_of_year, count in stats.heatmap.items():
-        try:
-            date = datetime(stats.year, 1, 1) + timedelta(days=day_of_year - 1)
-            month_commits[date.month - 1] += count
-        except (ValueError, OverflowError):
-            pass
+    month_commits = stats.month_commits
 
     max_commits = max(month_commits) if month_commits else 1
 
     for i, (month, count) in enumerate(zip(MONTH_NAMES, month_commits)):
         bar_len = int((count / max_commits) * 30) if max_commits > 0 else 0
-        bar = "█" * bar_len
+        bar = FULL_BLOCKS[bar_len]
         color = "green" if count > 0 else "dim"
         highlight = " ← 最活跃" if stats.most_active_month == i + 1 else ""
-        console.print(f"  {month:>4} [{color}]{bar}[/{color}] {count}{highlight}")
+        lines.append(f"  {month:>4} [{color}]{bar}[/{color}] {count}{highlight}")
+    lines.append("")
 
-    console.print()
+    console.print("\n".join(lines))
 
 
 def display_weekday_stats(stats: YearStats) -> None:
     """显示星期分布"""
-    if not stats.commits_by_weekday:
+    if not any(stats.commits_by_weekday):
         return
 
-    console.print("[bold]📆 星期分布[/bold]")
+    lines = ["[bold]📆 星期分布[/bold]"]
 
-    max_count = max(stats.commits_by_weekday.values()) if stats.commits_by_weekday else 1
+    max_count = max(stats.commits_by_weekday)
 
-    for i, day in enumerate(WEEKDAY_NAMES):
-        count = stats.commits_by_weekday.get(i, 0)
+    for i, (day, count) in enumerate(zip(WEEKDAY_NAMES, stats.commits_by_weekday)):
         bar_len = int((count / max_count) * 20) if max_count > 0 else 0
-        bar = "▓" * bar_len
+        bar = SHADE_BLOCKS[bar_len]
         color = "yellow" if i >= 5 else "cyan"  # 周末用黄色
-        console.print(f"  {day} [{color}]{bar}[/{color}] {count}")
+        lines.append(f"  {day} [{color}]{bar}[/{color}] {count}")
+    lines.append("")
 
-    console.print()
+    console.print("\n".join(lines))
 
 
 def display_languages(stats: YearStats) -> None:
@@ -156,28 +164,27 @@ def display_languages(stats: YearStats) -> None:
     table.add_column("分布", justify="left")
 
     # 按行数排序
-    sorted_langs = sorted(stats.languages.items(), key=lambda x: x[1], reverse=True)
-    total_lines = sum(stats.languages.values())
+    sorted_langs = stats.sorted_languages
+    total_lines = stats.total_language_lines
     max_lines = sorted_langs[0][1] if sorted_langs else 1
 
     for lang, lines in sorted_langs[:10]:  # 只显示前10
         percentage = (lines / total_lines * 100) if total_lines > 0 else 0
         bar_len = int((lines / max_lines) * 15)
-        bar = "█" * bar_len
-        table.add_row(lang, f"{lines:,}", f"{percentage:.1f}%", bar)
+        bar = FULL_BLOCKS[bar_len]
+        table.add_row(lang, format_number(lines), f"{percentage:.1f}%", bar)
 
     if len(sorted_langs) > 10:
         others = sum(lines for _, lines in sorted_langs[10:])
         percentage = (others / total_lines * 100) if total_lines > 0 else 0
-        table.add_row("其他", f"{others:,}", f"{percentage:.1f}%", "")
+        table.add_row("其他", format_number(others), f"{percentage:.1f}%", "")
 
-    console.print(table)
-    console.print()
+    console.print(table, "")
 
 
 def display_time_stats(stats: YearStats) -> None:
     """显示时间统计"""
-    if not stats.commits_by_hour:
+    if not any(stats.commits_by_hour):
         return
 
     table = Table(title="⏰ 提交时间分布", box=box.ROUNDED)
@@ -186,29 +193,28 @@ def display_time_stats(stats: YearStats) -> None:
     table.add_column("分布", justify="left")
 
     # 按时间段分组
+    hours = stats.commits_by_hour
     periods = {
-        "凌晨 (0-5点)": sum(stats.commits_by_hour.get(h, 0) for h in range(0, 5)),
-        "早晨 (5-10点)": sum(stats.commits_by_hour.get(h, 0) for h in range(5, 10)),
-        "中午 (10-14点)": sum(stats.commits_by_hour.get(h, 0) for h in range(10, 14)),
-        "下午 (14-17点)": sum(stats.commits_by_hour.get(h, 0) for h in range(14, 17)),
-        "傍晚 (17-19点)": sum(stats.commits_by_hour.get(h, 0) for h in range(17, 19)),
-        "晚上 (19-24点)": sum(stats.commits_by_hour.get(h, 0) for h in range(19, 24)),
+        "凌晨 (0-5点)": sum(hours[0:5]),
+        "早晨 (5-10点)": sum(hours[5:10]),
+        "中午 (10-14点)": sum(hours[10:14]),
+        "下午 (14-17点)": sum(hours[14:17]),
+        "傍晚 (17-19点)": sum(hours[17:19]),
+        "晚上 (19-24点)": sum(hours[19:24]),
     }
 
     max_period = max(periods.values()) if periods else 1
 
     for period, count in periods.items():
         bar_len = int((count / max_period) * 20) if max_period > 0 else 0
-        bar = "▓" * bar_len
+        bar = SHADE_BLOCKS[bar_len]
         table.add_row(period, str(count), bar)
 
-    console.print(table)
-    console.print()
+    console.print(table, "")
 
     # 最活跃的一天
     if stats.most_active_date:
-        console.print(f"  🔥 最活跃的一天: [bold]{stats.most_active_date}[/bold] ({stats.most_active_date_commits} 次提交)")
-        console.print()
+        console.print(f"  🔥 最活跃的一天: [bold]{stats.most_active_date}[/bold] ({stats.most_active_date_commits} 次提交)\n")
 
 
 def display_commit_words(stats: YearStats) -> None:
@@ -216,7 +222,7 @@ def display_commit_words(stats: YearStats) -> None:
     if not stats.commit_words:
         return
 
-    console.print("[bold]💬 提交信息高频词[/bold]")
+    lines = ["[bold]💬 提交信息高频词[/bold]"]
 
     # 取前 10 个
     top_words = list(stats.commit_words.items())[:10]
@@ -224,15 +230,16 @@ def display_commit_words(stats: YearStats) -> None:
 
     for word, count in top_words:
         bar_len = int((count / max_count) * 15)
-        bar = "▪" * bar_len
-        console.print(f"  {word:<15} [dim]{bar}[/dim] {count}")
+        bar = DOT_BLOCKS[bar_len]
+        lines.append(f"  {word:<15} [dim]{bar}[/dim] {count}")
+    lines.append("")
 
-    console.print()
+    console.print("\n".join(lines))
 
 
 def display_fun_facts(stats: YearStats) -> None:
     """显示趣味数据"""
-    console.print("[bold]🎯 趣味数据[/bold]")
+    lines = ["[bold]🎯 趣味数据[/bold]"]
 
     net_lines = stats.total_added_lines - stats.total_deleted_lines
 
@@ -240,26 +247,27 @@ def display_fun_facts(stats: YearStats) -> None:
     if net_lines > 0:
         # 假设一页代码 50 行
         pages = net_lines // 50
-        console.print(f"  📖 你写的代码打印出来约 [bold]{pages:,}[/bold] 页 A4 纸")
+        lines.append(f"  📖 你写的代码打印出来约 [bold]{format_number(pages)}[/bold] 页 A4 纸")
 
         # 假设每行代码平均 40 个字符
         chars = net_lines * 40
         novels = chars // 100000  # 一本小说约 10 万字
         if novels > 0:
-            console.print(f"  📚 字符数相当于 [bold]{novels}[/bold] 本小说")
+            lines.append(f"  📚 字符数相当于 [bold]{novels}[/bold] 本小说")
 
     # 时间投入
     if stats.total_commits > 0:
         # 假设每次提交平均花费 30 分钟
         hours = stats.total_commits * 30 // 60
-        console.print(f"  ⏱️  按每次提交 30 分钟算，约投入 [bold]{hours:,}[/bold] 小时")
+        lines.append(f"  ⏱️  按每次提交 30 分钟算，约投入 [bold]{format_number(hours)}[/bold] 小时")
 
     # 活跃度
     if stats.active_days > 0:
         coverage = stats.active_days / 365 * 100
-        console.print(f"  📊 全年覆盖率 [bold]{coverage:.1f}%[/bold]")
+        lines.append(f"  📊 全年覆盖率 [bold]{coverage:.1f}%[/bold]")
+    lines.append("")
 
-    console.print()
+    console.print("\n".join(lines))
 
 
 def display_repo_stats(stats: YearStats) -> None:
@@ -276,28 +284,30 @@ def display_repo_stats(stats: YearStats) -> None:
     table.add_column("净增", justify="right")
     table.add_column("分布", justify="left")
 
-    total_commits = sum(r.commits for r in stats.repo_summaries)
+    total_commits = stats.total_repo_commits
     max_commits = max(r.commits for r in stats.repo_summaries) if stats.repo_summaries else 1
 
+    # 先一次性算好每行的全部字符串，循环里只剩 add_row
+    rows = []
     for repo in stats.repo_summaries:
         pct = (repo.commits / total_commits * 100) if total_commits > 0 else 0
         bar_len = int((repo.commits / max_commits) * 15) if max_commits > 0 else 0
-        bar = "█" * bar_len
         net_lines = repo.added_lines - repo.deleted_lines
         net_style = "green" if net_lines >= 0 else "red"
-
-        table.add_row(
+        rows.append((
             repo.name[:20] + "..." if len(repo.name) > 20 else repo.name,
             str(repo.commits),
             f"{pct:.1f}%",
-            f"+{repo.added_lines:,}",
-            f"-{repo.deleted_lines:,}",
-            f"[{net_style}]{net_lines:,}[/{net_style}]",
-            bar,
-        )
+            f"+{format_number(repo.added_lines)}",
+            f"-{format_number(repo.deleted_lines)}",
+            f"[{net_style}]{format_number(net_lines)}[/{net_style}]",
+            FULL_BLOCKS[bar_len],
+        ))
+
+    for row in rows:
+        table.add_row(*row)
 
-    console.print(table)
-    console.print()
+    console.print(table, "")
 
 
 def display_repo_summaries(stats: YearStats) -> None:
@@ -305,39 +315,44 @@ def display_repo_summaries(stats: YearStats) -> None:
     if not stats.repo_summaries:
         return
 
-    console.print(Panel(
-        f"[bold magenta]📁 项目详情 ({len(stats.repo_summaries)} 个项目)[/bold magenta]",
-        border_style="magenta"
-    ))
+    lines = []
 
     for i, repo in enumerate(stats.repo_summaries, 1):
         # 项目标题
-        console.print(f"\n  [bold cyan]{i}. {repo.name}[/bold cyan]")
+        lines.append(f"\n  [bold cyan]{i}. {repo.name}[/bold cyan]")
 
         # 基本信息
         net_lines = repo.added_lines - repo.deleted_lines
-        console.print(f"     提交: {repo.commits} | 代码: +{repo.added_lines:,} -{repo.deleted_lines:,} (净增 {net_lines:,})")
+        lines.append(f"     提交: {repo.commits} | 代码: +{format_number(repo.added_lines)} -{format_number(repo.deleted_lines)} (净增 {format_number(net_lines)})")
 
         # 时间范围
         if repo.first_commit and repo.last_commit:
-            console.print(f"     时间: {repo.first_commit} ~ {repo.last_commit}")
+            lines.append(f"     时间: {repo.first_commit} ~ {repo.last_commit}")
 
         # 主要语言
         if repo.languages:
             langs = ", ".join(f"{lang}" for lang in list(repo.languages.keys())[:3])
-            console.print(f"     语言: [green]{langs}[/green]")
+            lines.append(f"     语言: [green]{langs}[/green]")
 
         # 主要工作
         if repo.main_work:
             works = " | ".join(repo.main_work[:3])
-            console.print(f"     工作: [yellow]{works}[/yellow]")
+            lines.append(f"     工作: [yellow]{works}[/yellow]")
 
         # 关键词
         if repo.keywords:
             keywords = ", ".join(repo.keywords[:5])
-            console.print(f"     关键词: [dim]{keywords}[/dim]")
+            lines.append(f"     关键词: [dim]{keywords}[/dim]")
+    lines.append("")
 
-    console.print()
+    # 标题面板和全部项目详情在一次 print 中渲染
+    console.print(
+        Panel(
+            f"[bold magenta]📁 项目详情 ({len(stats.repo_summaries)} 个项目)[/bold magenta]",
+            border_style="magenta"
+        ),
+        "\n".join(lines),
+    )
 
 
 def display_achievements(stats: YearStats) -> None:
@@ -345,13 +360,16 @@ def display_achievements(stats: YearStats) -> None:
     if not stats.achievements:
         return
 
-    console.print(Panel(
-        f"[bold yellow]🏆 解锁成就 ({len(stats.achievements)} 个)[/bold yellow]",
-        border_style="yellow"
-    ))
-
+    lines = []
     for name, desc in stats.achievements:
-        console.print(f"  [bold gold1]★ {name}[/bold gold1]")
-        console.print(f"    [dim]{desc}[/dim]")
-
-    console.print()
+        lines.append(f"  [bold gold1]★ {name}[/bold gold1]")
+        lines.append(f"    [dim]{desc}[/dim]")
+    lines.append("")
+
+    console.print(
+        Panel(
+            f"[bold yellow]🏆 解锁成就 ({len(stats.achievements)} 个)[/bold yellow]",
+            border_style="yellow"
+        ),
+        "\n".join(lines),
+    )
@@ -2,10 +2,12 @@
 
 import subprocess
 import re
+import sys
 from dataclasses import dataclass, field
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 
 # 编程语言扩展名映射
 LANGUAGE_MAP = {
@@ -65,8 +67,25 @@ LANGUAGE_MAP = {
     ".sol": "Solidity",
 }
 
+# POSIX 扩展正则 (ERE) 中需要转义的字符
+ERE_SPECIAL_CHARS = re.compile(r"([.\[\]()*+?{}|^$\\])")
 
-@dataclass
+# `--numstat -z` 的单条文件记录：added<TAB>deleted<TAB>filename<NUL>
+# 重命名时 filename 为空，随后是 原路径<NUL>新路径<NUL>，这里只取新路径
+NUMSTAT_PATTERN = re.compile(r"(\d+|-)\t(\d+|-)\t(?:\x00[^\x00]*\x00)?([^\x00]*)\x00")
+
+# 单个 --author 参数的长度上限（字节）：Linux 单个参数最长 128 KiB，
+# Windows 整条命令行最长 32767 个字符，取一个两边都安全的值
+MAX_AUTHOR_PATTERN_BYTES = 16 * 1024
+
+# 每条 commit 记录以 %H%x1f 开头（SHA-1 为 40 位，SHA-256 为 64 位十六进制）
+COMMIT_HEADER_PATTERN = re.compile(r"[0-9a-f]{40}(?:[0-9a-f]{24})?\x1f")
+
+# `git shortlog -sne` / `git check-mailmap` 的单行输出以 Name <email> 结尾，只取尖括号内的邮箱
+CONTACT_EMAIL_PATTERN = re.compile(r"<([^<>\n]*)>$", re.MULTILINE)
+
+
+@dataclass(slots=True)
 class FileDiff:
     """单个文件的变更信息"""
     filename: str
@@ -76,7 +95,7 @@ class FileDiff:
     empty_lines_added: int = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class CommitInfo:
     """提交信息"""
     hash: str
@@ -87,172 +106,362 @@ class CommitInfo:
     files: list[FileDiff] = field(default_factory=list)
 
 
+@lru_cache(maxsize=None)
+def get_language_by_suffix(suffix: str) -> Optional[str]:
+    """根据扩展名获取编程语言（结果按扩展名缓存）"""
+    return LANGUAGE_MAP.get(suffix.lower())
+
+
 def get_language(filename: str) -> Optional[str]:
     """根据文件扩展名获取编程语言"""
-    ext = Path(filename).suffix.lower()
-    return LANGUAGE_MAP.get(ext)
+    # 与 Path.suffix 一致：只看最后一段路径，且忽略以 . 开头的隐藏文件名
+    i = filename.rfind(".")
+    if i <= filename.rfind("/") + 1:
+        return None
+    # 按扩展名而不是完整路径缓存：不同扩展名的数量很少，缓存不会无限增长
+    return get_language_by_suffix(filename[i:])
+
+
+def run_git_command(
+    repo_path: Path,
+    args: list[str],
+    input: Optional[str] = None,
+) -> tuple[bool, str]:
+    """
+    执行 Git 命令
 
+    输出里可能带有作者姓名，编码不一定是 UTF-8；与 split_records 一样按 UTF-8 解码，
+    遇到非法字节时替换而不是报错，也不受系统区域设置的默认编码影响
 
-def run_git_command(repo_path: Path, args: list[str]) -> tuple[bool, str]:
-    """执行 Git 命令"""
+    Args:
+        repo_path: 仓库路径
+        args: git 子命令及参数
+        input: 写入 stdin 的内容，数据量不受命令行长度限制
+    """
     try:
         result = subprocess.run(
             ["git"] + args,
             cwd=repo_path,
+            input=input,
             capture_output=True,
-            text=True,
+            encoding="utf-8",
+            errors="replace",
             timeout=60,
         )
         return result.returncode == 0, result.stdout
-    except (subprocess.TimeoutExpired, FileNotFoundError) as e:
+    except (subprocess.TimeoutExpired, OSError) as e:
+        # OSError 包括找不到 git 和参数过长 (E2BIG) 等无法启动进程的情况
         return False, str(e)
 
 
-def parse_git_log(repo_path: Path, year: int, emails: set[str]) -> list[CommitInfo]:
+def iter_git_command(
+    repo_path: Path,
+    args: list[str],
+    chunk_size: int = 1 << 16,
+) -> Iterator[bytes]:
+    """
+    执行 Git 命令，按块流式返回 stdout 原始字节
+
+    git 一边输出一边被解析，内存占用只和块大小有关，不随输出总量增长
+
+    Raises:
+        subprocess.CalledProcessError: 命令执行失败（返回码非 0，或进程无法启动）
     """
-    解析 Git 日志
+    try:
+        process = subprocess.Popen(
+            ["git"] + args,
+            cwd=repo_path,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+    except OSError as e:
+        # 找不到 git、仓库目录不存在、参数过长 (E2BIG) 等
+        raise subprocess.CalledProcessError(-1, ["git"] + args) from e
+
+    with process:
+        while chunk := process.stdout.read(chunk_size):
+            yield chunk
+
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, process.args)
+
+
+def split_records(chunks: Iterable[bytes], separator: bytes) -> Iterator[str]:
+    """
+    从字节块流中切分出完整的记录
+
+    只处理已经完整的记录，最后一段不完整的数据留到下一块到达后再处理；
+    每条记录按 UTF-8 解码，遇到非法字节时替换而不是报错。
+    空记录也原样产出，分隔符的位置由调用方决定如何解释
+    """
+    buffer = bytearray()
+
+    for chunk in chunks:
+        buffer += chunk
+
+        # 最后一个分隔符之前的都是完整记录
+        end = buffer.rfind(separator)
+        if end < 0:
+            continue
+
+        for record in bytes(buffer[:end]).split(separator):
+            yield record.decode("utf-8", errors="replace")
+        del buffer[:end + len(separator)]
+
+    yield bytes(buffer).decode("utf-8", errors="replace")
+
+
+def join_commit_records(fragments: Iterable[str]) -> Iterator[str]:
+    """
+    把按 \x01 切开的片段还原成完整的 commit 记录
+
+    提交消息 (%B) 里也可能出现 \x01，只有以 COMMIT_HEADER_PATTERN 开头的片段
+    才是新记录的开始，其余片段连同被切掉的 \x01 接回上一条记录。
+    消息里恰好出现 \x01 + 完整哈希 + \x1f 时仍会被误判，实际中可以忽略
+    """
+    pending: Optional[str] = None
+
+    for fragment in fragments:
+        if COMMIT_HEADER_PATTERN.match(fragment):
+            if pending is not None:
+                yield pending
+            pending = fragment
+        elif pending is not None:
+            pending += "\x01" + fragment
+
+    if pending is not None:
+        yield pending
+
+
+def build_author_pattern(emails: set[str]) -> str:
+    """
+    生成 `git log --author` 使用的 ERE，只匹配给定邮箱的提交
+
+    git 用 "Name <email>" 匹配 --author，两侧的尖括号保证邮箱精确匹配
+
+    使用 ERE 而不是 --perl-regexp：PCRE 需要 git 编译时带 libpcre，
+    不支持时 git log 会直接报错退出，而 ERE 在所有 git 版本中都可用
+    """
+    escaped = sorted(ERE_SPECIAL_CHARS.sub(r"\\\1", email) for email in emails)
+    return f"<({'|'.join(escaped)})>"
+
+
+def expand_mailmap_emails(repo_path: Path, emails: set[str]) -> set[str]:
+    """
+    补充各邮箱在仓库 .mailmap 中映射到的规范邮箱
+
+    git log 按 .mailmap 映射后的身份匹配 --author，而 `git config user.email`
+    或手动输入的可能是映射前的原始邮箱；两者都放进匹配模式才不会漏掉提交。
+    只按邮箱查询，仅在“姓名 + 邮箱”同时匹配时才生效的 .mailmap 条目查不到
 
     Args:
         repo_path: 仓库路径
-        year: 统计年份
         emails: 要统计的邮箱集合（小写）
 
     Returns:
-        提交信息列表
+        原始邮箱及其规范邮箱的集合（小写）
+    """
+    expanded = set(emails)
+    # 通过 stdin 传入，候选邮箱再多也不会超出命令行长度限制
+    success, output = run_git_command(
+        repo_path,
+        ["check-mailmap", "--stdin"],
+        input="".join(f"<{email}>\n" for email in sorted(emails)),
+    )
+    if success:
+        expanded.update(
+            email.lower() for email in CONTACT_EMAIL_PATTERN.findall(output) if email
+        )
+    return expanded
+
+
+def parse_numstat(output: str) -> list[FileDiff]:
+    """
+    解析 `--numstat -z` 输出的文件变更
+
+    用预编译的 NUMSTAT_PATTERN 一次扫描全部记录，不再逐行 split
+
+    Args:
+        output: numstat 输出
+
+    Returns:
+        文件变更列表
+    """
+    files = []
+    append = files.append
+
+    for added, deleted, filename in NUMSTAT_PATTERN.findall(output):
+        if not filename:
+            continue
+
+        # 同一路径在多个提交中反复出现，驻留后只保留一份字符串
+        filename = sys.intern(filename)
+
+        # 热点循环：按位置传参 (filename, language, added_lines, deleted_lines)，
+        # 比关键字参数构造 dataclass 快不少
+        # 二进制文件的行数为 "-"，按 0 计
+        append(FileDiff(
+            filename,
+            get_language(filename),
+            int(added) if added != "-" else 0,
+            int(deleted) if deleted != "-" else 0,
+        ))
+
+    return files
+
+
+def parse_git_log(repo_path: Path, year: int, emails: set[str]) -> Iterator[CommitInfo]:
+    """
+    解析 Git 日志（同时获取每个提交的文件变更）
+
+    一次 `git log --numstat` 调用即可取回提交信息和 diff 统计，
+    无需再为每个提交单独启动 `git diff` 子进程；输出按块流式解析，
+    每解析完一个提交就立即产出，不必等整个仓库的日志读完
+
+    Args:
+        repo_path: 仓库路径
+        year: 统计年份
+        emails: 要统计的邮箱集合（小写）
+
+    Yields:
+        提交信息（已包含 files）
+
+    Raises:
+        subprocess.CalledProcessError: git 命令执行失败（在已产出的提交之后抛出）
     """
     # 获取指定年份的提交
     start_date = f"{year}-01-01"
     end_date = f"{year}-12-31"
 
-    # 使用 NULL 字符分隔字段和记录，以支持多行 commit message
-    # %x00 = NULL 字符，用于分隔字段
-    # %x00%x00 = 双 NULL，用于分隔记录
-    success, output = run_git_command(repo_path, [
+    # %x01 标记每条 commit 记录的开始（消息里的 \x01 由 join_commit_records 接回）
+    # %x1f = 单元分隔符 (US)，分隔头部字段；%B 放在最后，消息里即使出现 US 也不影响切分
+    # %B 之后的 NULL 将提交头部与 numstat 分开
+    # %aE 是经过 .mailmap 映射后的邮箱；--use-mailmap 让 --author 也按映射后的身份匹配，
+    # 不依赖各 git 版本 log.mailmap 的默认值
+    # -z 让 numstat 的每个文件记录也以 NULL 结尾，支持任意文件名
+    # 保留 git 默认的重命名检测（与原先的 git diff 一致）：纯移动的文件记为 0 行增删，
+    # 关闭后会被算成整份删除 + 整份新增，虚增新增行数、语言统计和相关成就
+    # --no-textconv / --no-ext-diff：始终按原始内容统计行数，不受用户的 diff 驱动配置影响
+    args = [
         "log",
         "--all",
         f"--after={start_date}",
         f"--before={end_date} 23:59:59",
-        "--format=%H%x00%ae%x00%aI%x00%B%x00%x00",
-    ])
-
-    if not success or not output.strip():
-        return []
+        "--numstat",
+        "--no-textconv",
+        "--no-ext-diff",
+        "--use-mailmap",
+        "-z",
+        "--format=format:%x01%H%x1f%aE%x1f%aI%x1f%B%x00",
+    ]
+
+    # 在 git 内部按作者过滤，其他人的提交既不计算 diff 也不输出；
+    # 原始邮箱和 .mailmap 映射后的规范邮箱都要匹配，%aE 输出的是后者
+    # 邮箱过多（如预选了大型开源仓库的全部贡献者）时模式会超出参数长度限制，
+    # 此时不交给 git 过滤，只靠下面按 %aE 的检查
+    author_emails = expand_mailmap_emails(repo_path, emails) if emails else set()
+    if author_emails:
+        author_pattern = build_author_pattern(author_emails)
+        if len(author_pattern.encode("utf-8")) <= MAX_AUTHOR_PATTERN_BYTES:
+            args += [
+                "--extended-regexp",
+                "--regexp-ignore-case",
+                f"--author={author_pattern}",
+            ]
+
+    chunks = iter_git_command(repo_path, args)
 
-    commits = []
     seen_hashes = set()
 
-    # 按双 NULL 分隔每条 commit 记录
-    records = output.split("\x00\x00")
-
-    for record in records:
-        record = record.strip()
-        if not record:
-            continue
-
-        parts = record.split("\x00", 3)
+    for record in join_commit_records(split_records(chunks, b"\x01")):
+        header, _, numstat = record.partition("\x00")
+        parts = header.split("\x1f", 3)
         if len(parts) < 4:
             continue
 
         commit_hash, email, date_str, message = parts
-        email = email.lower()
         commit_hash = commit_hash.lower()
-        message = message.strip()  # 去除 %B 末尾的换行
+        email = email.lower()
 
-        # 过滤：邮箱和去重
-        if emails and email not in emails:
+        # --author 匹配的是整个 "Name <email>"，姓名里带尖括号邮箱的提交也会被放过，
+        # 这里再按 %aE 精确核对一次；被丢弃的记录不再解析日期、消息和 numstat
+        if author_emails and email not in author_emails:
             continue
         if commit_hash in seen_hashes:
             continue
         seen_hashes.add(commit_hash)
 
+        # %B 以一个换行结尾，切掉即可，不必 strip 整条消息
+        if message.endswith("\n"):
+            message = message[:-1]
+
         try:
-            # 解析 ISO 格式日期
-            date = datetime.fromisoformat(date_str.replace("Z", "+00:00"))
+            # 解析 ISO 格式日期（fromisoformat 是 C 实现，已足够快）
+            # 只有 UTC 时间才可能以 Z 结尾，避免每条记录都 replace 一次
+            if date_str.endswith("Z"):
+                date_str = date_str[:-1] + "+00:00"
+            date = datetime.fromisoformat(date_str)
         except ValueError:
             continue
 
-        commits.append(CommitInfo(
+        yield CommitInfo(
             hash=commit_hash,
             email=email,
             date=date,
             message=message,
-        ))
-
-    return commits
+            files=parse_numstat(numstat),
+        )
 
 
-def parse_git_diff(repo_path: Path, commit_hash: str) -> list[FileDiff]:
+def parse_repo(repo_path: Path, year: int, emails: set[str]) -> list[CommitInfo]:
     """
-    解析单个提交的 diff
+    解析单个仓库的全部提交（可在子进程中独立执行）
 
     Args:
         repo_path: 仓库路径
-        commit_hash: 提交哈希
+        year: 统计年份
+        emails: 要统计的邮箱集合（小写）
 
     Returns:
-        文件变更列表
+        提交信息列表（已设置 repo_name 和 files）
     """
-    success, output = run_git_command(repo_path, [
-        "diff",
-        f"{commit_hash}^!",
-        "--numstat",
-    ])
-
-    if not success:
-        # 可能是初始提交
-        success, output = run_git_command(repo_path, [
-            "diff",
-            "--numstat",
-            "4b825dc642cb6eb9a060e54bf8d69288fbee4904",  # empty tree
-            commit_hash,
-        ])
+    # 所有提交共享同一个仓库名字符串
+    repo_name = repo_path.name
+    commits = []
 
-    if not success or not output.strip():
+    try:
+        for commit in parse_git_log(repo_path, year, emails):
+            commit.repo_name = repo_name
+            commits.append(commit)
+    except (subprocess.CalledProcessError, OSError, UnicodeError):
+        # git 执行失败或输出无法解析时整个仓库都不计入，不保留已解析的部分；
+        # 异常不会传回进程池，其他仓库照常统计
         return []
 
-    files = []
-    for line in output.strip().split("\n"):
-        if not line:
-            continue
-
-        parts = line.split("\t")
-        if len(parts) < 3:
-            continue
-
-        added, deleted, filename = parts[0], parts[1], parts[2]
-
-        # 处理二进制文件
-        try:
-            added_lines = int(added) if added != "-" else 0
-            deleted_lines = int(deleted) if deleted != "-" else 0
-        except ValueError:
-            continue
-
-        files.append(FileDiff(
-            filename=filename,
-            language=get_language(filename),
-            added_lines=added_lines,
-            deleted_lines=deleted_lines,
-        ))
-
-    return files
+    return commits
 
 
 def get_user_emails(repo_path: Path) -> set[str]:
     """获取当前用户在仓库中使用的邮箱"""
     success, output = run_git_command(repo_path, ["config", "user.email"])
-    if success and output.strip():
-        return {output.strip().lower()}
+    email = output.strip() if success else ""
+    if email:
+        return {email.lower()}
     return set()
 
 
 def get_all_contributor_emails(repo_path: Path) -> set[str]:
-    """获取仓库所有贡献者邮箱"""
+    """
+    获取仓库所有贡献者邮箱
+
+    由 `git shortlog` 在 git 内部去重并按 .mailmap 合并同一作者的多个邮箱，
+    每个作者只输出一行，不必把每个提交的邮箱都传回 Python
+    """
     success, output = run_git_command(repo_path, [
-        "log",
+        "shortlog",
+        "-sne",
         "--all",
-        "--format=%ae",
     ])
     if success:
-        return {email.lower() for email in output.strip().split("\n") if email}
+        return {email.lower() for email in CONTACT_EMAIL_PATTERN.findall(output) if email}
     return set()
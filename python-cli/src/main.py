@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 """MyYearWithGit - Git 年度提交统计命令行工具"""
 
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 
@@ -9,14 +11,17 @@ import questionary
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
-from .scanner import scan_repos
-from .git_parser import parse_git_log, parse_git_diff, get_user_emails, get_all_contributor_emails
+from .scanner import scan_repos, filter_repos_by_keyword
+from .git_parser import parse_repo, get_user_emails, get_all_contributor_emails
 from .statistics import analyze_commits
 from .display import display_stats
 from .export import export_to_markdown
 
 console = Console()
 
+# 仓库数超过该值时，先询问是否全选或按关键词排除，避免一次渲染过长的勾选列表
+REPO_SELECT_THRESHOLD = 50
+
 
 def select_directory() -> Path | None:
     """让用户输入要扫描的目录"""
@@ -52,6 +57,27 @@ def scan_and_select_repos(root_path: Path) -> list[Path]:
 
     console.print(f"[green]找到 {len(repos)} 个仓库[/green]\n")
 
+    if len(repos) > REPO_SELECT_THRESHOLD:
+        analyze_all = questionary.confirm(
+            f"仓库较多，是否直接分析全部 {len(repos)} 个仓库?",
+            default=True,
+        ).ask()
+        if analyze_all is None:
+            return []
+        if analyze_all:
+            return sorted(repos, key=lambda x: x.name.lower())
+
+        keyword = questionary.text(
+            "输入要排除的路径关键词 (留空跳过):",
+        ).ask()
+        if keyword is None:
+            return []
+        if keyword.strip():
+            repos = filter_repos_by_keyword(repos, keyword.strip())
+            console.print(f"[green]排除后剩余 {len(repos)} 个仓库[/green]\n")
+            if not repos:
+                return []
+
     # 让用户选择仓库
     choices = [
         questionary.Choice(
@@ -137,21 +163,28 @@ def analyze_repos(repos: list[Path], year: int, emails: set[str]):
     ) as progress:
         task = progress.add_task("分析提交历史...", total=len(repos))
 
-        for repo in repos:
-            progress.update(task, description=f"分析: {repo.name}")
-
-            # 获取提交
-            commits = parse_git_log(repo, year, emails)
-
-            for commit in commits:
-                if commit.hash not in seen_hashes:
-                    seen_hashes.add(commit.hash)
-                    # 设置仓库名和 diff 信息
-                    commit.repo_name = repo.name
-                    commit.files = parse_git_diff(repo, commit.hash)
-                    all_commits.append(commit)
-
-            progress.advance(task)
+        # 各仓库互不依赖，交给进程池并行解析；哪个仓库先完成就先更新进度
+        results = [[] for _ in repos]
+        # 每个仓库只需一个 git log 进程，进程数不超过仓库数，避免白白启动空闲进程
+        max_workers = max(1, min(os.cpu_count() or 1, len(repos)))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(parse_repo, repo, year, emails): i
+                for i, repo in enumerate(repos)
+            }
+
+            for future in as_completed(futures):
+                i = futures[future]
+                results[i] = future.result()
+                progress.update(task, description=f"分析: {repos[i].name}")
+                progress.advance(task)
+
+    # 按仓库顺序合并去重，保证结果与完成顺序无关
+    for commits in results:
+        for commit in commits:
+            if commit.hash not in seen_hashes:
+                seen_hashes.add(commit.hash)
+                all_commits.append(commit)
 
     console.print(f"\n[green]共分析 {len(all_commits)} 个提交[/green]")
 
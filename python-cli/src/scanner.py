@@ -7,7 +7,6 @@ from typing import Generator
 # 跳过的目录
 BLOCKED_DIRS = {
     "node_modules",
-    ".git",
     "__pycache__",
     ".venv",
     "venv",
@@ -18,42 +17,61 @@ BLOCKED_DIRS = {
 }
 
 
-def scan_repos(root_path: str | Path, max_depth: int = 64) -> Generator[Path, None, None]:
+def scan_repos(
+    root_path: str | Path,
+    max_depth: int = 64,
+    include_nested: bool = False,
+) -> Generator[Path, None, None]:
     """
     递归扫描目录，查找所有 Git 仓库
 
+    默认找到仓库后不再深入其工作区，仓库内嵌套的仓库（含子模块）会被跳过；
+    扫描起始目录本身是仓库时（例如用 Git 管理 dotfiles 的主目录）仍会继续向下扫描
+
     Args:
         root_path: 扫描起始路径
         max_depth: 最大递归深度
+        include_nested: 是否继续扫描仓库内部的嵌套仓库和子模块
 
     Yields:
         找到的 Git 仓库路径
     """
     root = Path(root_path).resolve()
 
-    def _scan(current: Path, depth: int) -> Generator[Path, None, None]:
+    def _scan(current: str, depth: int) -> Generator[Path, None, None]:
         if depth > max_depth:
             return
 
-        if not current.is_dir():
+        # 一次 scandir 同时判断是否是 Git 仓库并收集子目录；
+        # DirEntry 的类型信息来自目录读取结果，不必再逐项 stat。
+        # .git 本身从不进入递归
+        is_repo = False
+        subdirs = []
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.name == ".git":
+                        is_repo = True
+                        continue
+                    if entry.name.lower() in BLOCKED_DIRS:
+                        continue
+                    # 不跟随符号链接，避免链接成环时重复扫描
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+        except OSError:
+            # 不是目录、不存在或没有权限
             return
 
-        # 检查是否是 Git 仓库
-        git_dir = current / ".git"
-        if git_dir.exists():
-            yield current
-            # 继续扫描子模块
+        if is_repo:
+            yield Path(current)
+            # 起始目录总是继续深入，否则其下的仓库一个也找不到
+            if not include_nested and depth > 0:
+                return
 
-        try:
-            for item in current.iterdir():
-                if item.name.lower() in BLOCKED_DIRS:
-                    continue
-                if item.is_dir():
-                    yield from _scan(item, depth + 1)
-        except PermissionError:
-            pass
-
-    yield from _scan(root, 0)
+        for path in subdirs:
+            yield from _scan(path, depth + 1)
+
+    yield from _scan(str(root), 0)
 
 
 def filter_repos_by_keyword(repos: list[Path], keyword: str) -> list[Path]:
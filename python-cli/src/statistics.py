@@ -1,14 +1,16 @@
 """统计分析模块"""
 
+import re
 from collections import Counter, defaultdict
 from dataclasses import dataclass, field
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from functools import cached_property
+from typing import Iterator, Optional
 
 from .git_parser import CommitInfo, FileDiff
 
 
-@dataclass
+@dataclass(slots=True)
 class RepoSummary:
     """单个仓库的摘要"""
     name: str
@@ -34,15 +36,15 @@ class YearStats:
     total_deleted_lines: int = 0
     active_days: int = 0
 
-    # 热力图数据 (day_of_year -> count)
-    heatmap: dict[int, int] = field(default_factory=dict)
+    # 热力图数据，下标为年内第几天 (1-366)，下标 0 不使用
+    heatmap: list[int] = field(default_factory=lambda: [0] * 367)
 
     # 语言统计 (language -> lines)
     languages: dict[str, int] = field(default_factory=dict)
 
     # 时间统计
-    commits_by_hour: dict[int, int] = field(default_factory=dict)
-    commits_by_weekday: dict[int, int] = field(default_factory=dict)
+    commits_by_hour: list[int] = field(default_factory=lambda: [0] * 24)  # 下标为小时 (0-23)
+    commits_by_weekday: list[int] = field(default_factory=lambda: [0] * 7)  # 下标 0=周一, 6=周日
     weekend_days: int = 0
 
     # 特殊日期
@@ -66,6 +68,38 @@ class YearStats:
     # 成就
     achievements: list[tuple[str, str]] = field(default_factory=list)
 
+    # 以下为派生数据，展示和导出都会用到，首次访问时计算并缓存
+    # （须在 analyze_commits 完成后再访问）
+
+    @cached_property
+    def sorted_languages(self) -> list[tuple[str, int]]:
+        """按代码行数降序排列的语言统计"""
+        return sorted(self.languages.items(), key=lambda x: x[1], reverse=True)
+
+    @cached_property
+    def total_language_lines(self) -> int:
+        """所有语言的代码行数之和"""
+        return sum(self.languages.values())
+
+    @cached_property
+    def total_repo_commits(self) -> int:
+        """各仓库提交数之和"""
+        return sum(r.commits for r in self.repo_summaries)
+
+    @cached_property
+    def month_commits(self) -> list[int]:
+        """
+        每月提交数（下标 0 为一月），由热力图按月切片求和
+
+        平年没有第 366 天，该位置的计数与之前的逐日映射一样归入一月
+        """
+        starts = [date(self.year, m, 1).timetuple().tm_yday for m in range(1, 13)]
+        year_end = date(self.year, 12, 31).timetuple().tm_yday + 1
+        starts.append(year_end)
+        months = [sum(self.heatmap[a:b]) for a, b in zip(starts, starts[1:])]
+        months[0] += sum(self.heatmap[year_end:])
+        return months
+
 
 # 默认排除的非代码语言
 DEFAULT_EXCLUDE_LANGUAGES = {
@@ -76,6 +110,57 @@ DEFAULT_EXCLUDE_LANGUAGES = {
     "reStructuredText",
 }
 
+# 提交信息分词：特殊字符替换为空格，保留字母数字和中文
+NON_WORD_PATTERN = re.compile(r'[^\w\s\u4e00-\u9fff]')
+
+# 词频统计时忽略的常见无意义词
+STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'is', 'are', 'was', 'were', 'be', 'been',
+    'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
+    'this', 'that', 'it', 'from', 'by', 'as', 'if', 'not', 'no',
+    'fix', 'add', 'update', 'remove', 'change', 'merge', 'commit',
+    'wip', 'todo', 'fixme', 'xxx', 'test', 'tests', 'file', 'files',
+})
+
+# 从提交信息中提取工作类型（关键词 -> 工作类型）
+WORK_PATTERNS = {
+    "feat": "新功能开发",
+    "feature": "新功能开发",
+    "新增": "新功能开发",
+    "添加": "新功能开发",
+    "fix": "Bug 修复",
+    "bugfix": "Bug 修复",
+    "修复": "Bug 修复",
+    "refactor": "代码重构",
+    "重构": "代码重构",
+    "优化": "性能优化",
+    "perf": "性能优化",
+    "docs": "文档编写",
+    "文档": "文档编写",
+    "test": "测试相关",
+    "测试": "测试相关",
+    "style": "代码风格",
+    "chore": "工程配置",
+    "ci": "CI/CD 配置",
+    "build": "构建相关",
+    "deploy": "部署相关",
+    "部署": "部署相关",
+    "api": "API 开发",
+    "接口": "API 开发",
+    "ui": "UI 开发",
+    "界面": "UI 开发",
+    "database": "数据库相关",
+    "数据库": "数据库相关",
+    "security": "安全相关",
+    "安全": "安全相关",
+    "auth": "认证授权",
+    "登录": "认证授权",
+}
+
+# 预先展开为 (关键词, 工作类型) 元组，并单独挑出纯英文关键词
+ALL_WORK_PATTERNS = tuple(WORK_PATTERNS.items())
+ASCII_WORK_PATTERNS = tuple(item for item in ALL_WORK_PATTERNS if item[0].isascii())
+
 
 def analyze_commits(
     commits: list[CommitInfo],
@@ -102,61 +187,89 @@ def analyze_commits(
         return stats
 
     # 按日期分组
-    commits_by_date: dict[str, list[CommitInfo]] = defaultdict(list)
+    commits_by_date: Counter = Counter()  # 日期序数 -> 提交数
     commits_by_month: dict[int, int] = defaultdict(int)
-    active_dates: set[str] = set()
-    weekend_dates: set[str] = set()
+    active_dates: set[int] = set()   # 日期序数 (date.toordinal())
+    weekend_dates: set[int] = set()
     word_counter: Counter = Counter()
 
-    for commit in commits:
-        stats.total_commits += 1
+    # 按仓库分组，供生成仓库摘要使用
+    repo_commits: dict[str, list[CommitInfo]] = defaultdict(list)
+    repo_word_counters: dict[str, Counter] = defaultdict(Counter)
+
+    # 热点循环：累加到局部变量，结束后再写回 stats
+    languages: dict[str, int] = defaultdict(int)
+    heatmap = stats.heatmap
+    commits_by_hour = stats.commits_by_hour
+    commits_by_weekday = stats.commits_by_weekday
+    total_added = 0
+    total_deleted = 0
+
+    # 年内第几天 = 序数日期 - 上一年最后一天的序数
+    day_zero = date(year, 1, 1).toordinal() - 1
 
+    for commit in commits:
         # 统计行数
         for f in commit.files:
-            stats.total_added_lines += f.added_lines
-            stats.total_deleted_lines += f.deleted_lines
+            total_added += f.added_lines
+            total_deleted += f.deleted_lines
 
             # 语言统计（排除非代码语言）
-            if f.language and f.language not in exclude_languages:
-                stats.languages[f.language] = stats.languages.get(f.language, 0) + f.added_lines
+            language = f.language
+            if language and language not in exclude_languages:
+                languages[language] += f.added_lines
+
+        commit_date = commit.date
+        day = commit_date.date()
 
-        # 日期统计
-        date_str = commit.date.strftime("%Y-%m-%d")
-        commits_by_date[date_str].append(commit)
-        active_dates.add(date_str)
+        # 日期统计：以序数为键只计数，不保存提交本身
+        ordinal = day.toordinal()
+        commits_by_date[ordinal] += 1
+        active_dates.add(ordinal)
 
         # 月份统计
-        commits_by_month[commit.date.month] += 1
+        commits_by_month[commit_date.month] += 1
 
-        # 热力图
-        day_of_year = commit.date.timetuple().tm_yday
-        stats.heatmap[day_of_year] = stats.heatmap.get(day_of_year, 0) + 1
+        # 热力图（时区导致的跨年提交很少见，才走 timetuple）
+        if day.year == year:
+            heatmap[ordinal - day_zero] += 1
+        else:
+            heatmap[commit_date.timetuple().tm_yday] += 1
 
         # 时间统计
-        hour = commit.date.hour
-        stats.commits_by_hour[hour] = stats.commits_by_hour.get(hour, 0) + 1
+        commits_by_hour[commit_date.hour] += 1
 
-        # 星期统计
-        weekday = commit.date.weekday()  # 0=Monday, 6=Sunday
-        stats.commits_by_weekday[weekday] = stats.commits_by_weekday.get(weekday, 0) + 1
+        # 星期统计：由序数直接推出，与 date.weekday() 相同 (0=Monday, 6=Sunday)
+        weekday = (ordinal + 6) % 7
+        commits_by_weekday[weekday] += 1
 
         # 周末统计
         if weekday >= 5:  # Saturday or Sunday
-            weekend_dates.add(date_str)
+            weekend_dates.add(ordinal)
 
-        # 提交信息词频
+        # 提交信息词频（同一份分词结果也用于仓库关键词，此时才需要物化为列表）
         words = extract_words(commit.message)
+        if commit.repo_name:
+            words = list(words)
+            repo_commits[commit.repo_name].append(commit)
+            repo_word_counters[commit.repo_name].update(words)
         word_counter.update(words)
 
+    stats.total_commits = len(commits)
+    stats.total_added_lines = total_added
+    stats.total_deleted_lines = total_deleted
+    stats.languages = dict(languages)
+
     # 活跃天数
     stats.active_days = len(active_dates)
     stats.weekend_days = len(weekend_dates)
 
     # 最活跃的一天
+    # （只需在至多 366 个日期中取最大值；并列时取最先出现的日期）
     if commits_by_date:
-        most_active = max(commits_by_date.items(), key=lambda x: len(x[1]))
-        stats.most_active_date = most_active[0]
-        stats.most_active_date_commits = len(most_active[1])
+        most_active = max(commits_by_date.items(), key=lambda x: x[1])
+        stats.most_active_date = date.fromordinal(most_active[0]).isoformat()
+        stats.most_active_date_commits = most_active[1]
 
     # 最活跃的月份
     if commits_by_month:
@@ -171,7 +284,9 @@ def analyze_commits(
     stats.commit_words = dict(word_counter.most_common(20))
 
     # 按仓库分组生成摘要
-    stats.repo_summaries = generate_repo_summaries(commits, exclude_languages)
+    stats.repo_summaries = generate_repo_summaries(
+        repo_commits, repo_word_counters, exclude_languages,
+    )
     stats.repos_count = len(stats.repo_summaries)
 
     # 计算成就
@@ -181,18 +296,21 @@ def analyze_commits(
 
 
 def generate_repo_summaries(
-    commits: list[CommitInfo],
+    repo_commits: dict[str, list[CommitInfo]],
+    repo_word_counters: dict[str, Counter],
     exclude_languages: set[str],
 ) -> list[RepoSummary]:
-    """按仓库分组生成摘要"""
-    from collections import defaultdict
+    """
+    生成各仓库摘要
 
-    # 按仓库分组
-    repo_commits: dict[str, list[CommitInfo]] = defaultdict(list)
-    for commit in commits:
-        if commit.repo_name:
-            repo_commits[commit.repo_name].append(commit)
+    Args:
+        repo_commits: 仓库名 -> 该仓库的提交列表
+        repo_word_counters: 仓库名 -> 提交信息词频（在 analyze_commits 中已统计）
+        exclude_languages: 要排除的语言集合
 
+    Returns:
+        按提交数降序排列的仓库摘要
+    """
     summaries = []
 
     for repo_name, repo_commit_list in repo_commits.items():
@@ -201,7 +319,6 @@ def generate_repo_summaries(
 
         # 统计代码行数和语言
         lang_counter: Counter = Counter()
-        word_counter: Counter = Counter()
         commit_dates: list[datetime] = []
 
         for commit in repo_commit_list:
@@ -211,10 +328,6 @@ def generate_repo_summaries(
             date_str = commit.date.strftime("%Y-%m-%d %H:%M")
             summary.commit_messages.append((date_str, commit.message))
 
-            # 提取提交信息关键词
-            words = extract_words(commit.message)
-            word_counter.update(words)
-
             for f in commit.files:
                 summary.added_lines += f.added_lines
                 summary.deleted_lines += f.deleted_lines
@@ -226,7 +339,7 @@ def generate_repo_summaries(
         summary.languages = dict(lang_counter.most_common(5))
 
         # 主要关键词
-        summary.keywords = [w for w, _ in word_counter.most_common(10)]
+        summary.keywords = [w for w, _ in repo_word_counters[repo_name].most_common(10)]
 
         # 分析主要工作内容
         summary.main_work = analyze_main_work(repo_commit_list)
@@ -250,46 +363,13 @@ def generate_repo_summaries(
 
 def analyze_main_work(commits: list[CommitInfo]) -> list[str]:
     """分析主要工作内容"""
-    # 从提交信息中提取工作类型
-    work_patterns = {
-        "feat": "新功能开发",
-        "feature": "新功能开发",
-        "新增": "新功能开发",
-        "添加": "新功能开发",
-        "fix": "Bug 修复",
-        "bugfix": "Bug 修复",
-        "修复": "Bug 修复",
-        "refactor": "代码重构",
-        "重构": "代码重构",
-        "优化": "性能优化",
-        "perf": "性能优化",
-        "docs": "文档编写",
-        "文档": "文档编写",
-        "test": "测试相关",
-        "测试": "测试相关",
-        "style": "代码风格",
-        "chore": "工程配置",
-        "ci": "CI/CD 配置",
-        "build": "构建相关",
-        "deploy": "部署相关",
-        "部署": "部署相关",
-        "api": "API 开发",
-        "接口": "API 开发",
-        "ui": "UI 开发",
-        "界面": "UI 开发",
-        "database": "数据库相关",
-        "数据库": "数据库相关",
-        "security": "安全相关",
-        "安全": "安全相关",
-        "auth": "认证授权",
-        "登录": "认证授权",
-    }
-
     work_counter: Counter = Counter()
 
     for commit in commits:
         msg_lower = commit.message.lower()
-        for pattern, work_type in work_patterns.items():
+        # 纯 ASCII 的提交信息不可能包含中文关键词，只需检查英文关键词
+        patterns = ASCII_WORK_PATTERNS if msg_lower.isascii() else ALL_WORK_PATTERNS
+        for pattern, work_type in patterns:
             if pattern in msg_lower:
                 work_counter[work_type] += 1
 
@@ -297,53 +377,49 @@ def analyze_main_work(commits: list[CommitInfo]) -> list[str]:
     return [work for work, _ in work_counter.most_common(5)]
 
 
-def extract_words(text: str) -> list[str]:
-    """从文本中提取有意义的词汇"""
-    import re
+def extract_words(text: str) -> Iterator[str]:
+    """从文本中提取有意义的词汇（惰性产出，可直接交给 Counter.update）"""
     # 移除特殊字符，保留字母数字和中文
-    text = re.sub(r'[^\w\s\u4e00-\u9fff]', ' ', text.lower())
-    words = text.split()
+    words = NON_WORD_PATTERN.sub(' ', text.lower()).split()
 
     # 过滤掉太短的词和常见无意义词
-    stop_words = {
-        'the', 'a', 'an', 'is', 'are', 'was', 'were', 'be', 'been',
-        'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
-        'this', 'that', 'it', 'from', 'by', 'as', 'if', 'not', 'no',
-        'fix', 'add', 'update', 'remove', 'change', 'merge', 'commit',
-        'wip', 'todo', 'fixme', 'xxx', 'test', 'tests', 'file', 'files',
-    }
+    return (w for w in words if len(w) > 2 and w not in STOP_WORDS)
 
-    return [w for w in words if len(w) > 2 and w not in stop_words]
 
+def calculate_streak(active_dates: set[int], year: int) -> tuple[int, int]:
+    """
+    计算最长连续提交天数和当前连击
 
-def calculate_streak(active_dates: set[str], year: int) -> tuple[int, int]:
-    """计算最长连续提交天数和当前连击"""
-    from datetime import date, timedelta
+    Args:
+        active_dates: 有提交的日期序数 (date.toordinal()) 集合
+        year: 统计年份
 
+    Returns:
+        (最长连续天数, 当前连击天数)
+    """
     if not active_dates:
         return 0, 0
 
-    # 转换为 date 对象并排序
-    dates = sorted([datetime.strptime(d, "%Y-%m-%d").date() for d in active_dates])
+    # 序数相差 1 即为相邻两天，全程只做整数运算
+    ordinals = sorted(active_dates)
 
     max_streak = 1
     current = 1
 
-    for i in range(1, len(dates)):
-        if (dates[i] - dates[i-1]).days == 1:
+    for i in range(1, len(ordinals)):
+        if ordinals[i] - ordinals[i-1] == 1:
             current += 1
             max_streak = max(max_streak, current)
         else:
             current = 1
 
     # 计算当前连击（从今天往回数）
-    today = date.today()
     current_streak = 0
 
-    check_date = today
-    while check_date.strftime("%Y-%m-%d") in active_dates:
+    check_ordinal = date.today().toordinal()
+    while check_ordinal in active_dates:
         current_streak += 1
-        check_date -= timedelta(days=1)
+        check_ordinal -= 1
 
     return max_streak, current_streak
 
@@ -372,8 +448,8 @@ def calculate_achievements(stats: YearStats) -> list[tuple[str, str]]:
         achievements.append(("编程语言大师", f"使用了 {len(stats.languages)} 种编程语言"))
 
     # 时间偏好成就
-    if stats.commits_by_hour:
-        favorite_hour = max(stats.commits_by_hour.items(), key=lambda x: x[1])[0]
+    if any(stats.commits_by_hour):
+        favorite_hour = max(range(24), key=stats.commits_by_hour.__getitem__)
         if 0 <= favorite_hour < 5:
             achievements.append(("夜猫子", "凌晨还在写代码，注意休息"))
         elif 5 <= favorite_hour < 10: